@@ -1,4 +1,3 @@
-from copy import deepcopy
 from pathlib import Path
 
 import pandas as pd
@@ -40,7 +39,9 @@ qp.environ['SAMPLE_SIZE'] = 100
 
 
 def newLR():
-    return LogisticRegression(max_iter=1000, solver='lbfgs', n_jobs=-1)
+    # with warm_start, the refit on training+validation starts from the coefficients of the best model found during
+    # model selection
+    return LogisticRegression(max_iter=1000, solver='lbfgs', warm_start=True)
 
 
 __C_range = np.logspace(-3, 3, 7)
@@ -53,24 +54,26 @@ svmperf_params = {
 }
 
 
+# models are yielded as factories (rather than as instances) so that every run trains a fresh model, and so that no
+# model state is shared across experiments
 def quantification_models():
-    yield 'cc', CC(newLR()), lr_params
-    yield 'acc', ACC(newLR()), lr_params
-    yield 'pcc', PCC(newLR()), lr_params
-    yield 'pacc', PACC(newLR()), lr_params
-    yield 'MAX', MAX(newLR()), lr_params
-    yield 'MS', MS(newLR()), lr_params
-    yield 'MS2', MS2(newLR()), lr_params
-    yield 'sldc', EMQ(newLR()), lr_params
-    yield 'svmmae', newSVMAE(), svmperf_params
-    yield 'hdy', HDy(newLR()), lr_params
+    yield 'cc', lambda: CC(newLR()), lr_params
+    yield 'acc', lambda: ACC(newLR()), lr_params
+    yield 'pcc', lambda: PCC(newLR()), lr_params
+    yield 'pacc', lambda: PACC(newLR()), lr_params
+    yield 'MAX', lambda: MAX(newLR()), lr_params
+    yield 'MS', lambda: MS(newLR()), lr_params
+    yield 'MS2', lambda: MS2(newLR()), lr_params
+    yield 'sldc', lambda: EMQ(newLR()), lr_params
+    yield 'svmmae', newSVMAE, svmperf_params
+    yield 'hdy', lambda: HDy(newLR()), lr_params
 
 
 def quantification_cuda_models():
     device = 'cuda' if torch.cuda.is_available() else 'cpu'
     print(f'Running QuaNet in {device}')
-    learner = LowRankLogisticRegression()
-    yield 'quanet', QuaNet(learner, checkpointdir=args.checkpointdir, device=device), lr_params
+    new_quanet = lambda: QuaNet(LowRankLogisticRegression(), checkpointdir=args.checkpointdir, device=device)
+    yield 'quanet', new_quanet, lr_params
 
 
 def evaluate_experiment(true_prevalences, estim_prevalences):
@@ -81,8 +84,12 @@ def evaluate_experiment(true_prevalences, estim_prevalences):
     print()
 
 
-def result_path(path, dataset_name, model_name, run, optim_loss):
-    return os.path.join(path, f'{dataset_name}-{model_name}-run{run}-{optim_loss}.pkl')
+def result_name(dataset_name, model_name, run, optim_loss):
+    return f'{dataset_name}-{model_name}-run{run}-{optim_loss}.pkl'
+
+
+def result_path(dataset_name, model_name, run, optim_loss):
+    return os.path.join(args.results, result_name(dataset_name, model_name, run, optim_loss))
 
 
 def parse_result_path(path):
@@ -92,39 +99,70 @@ def parse_result_path(path):
     return dataset, method, run, metric
 
 
+def list_results(path):
+    # collects the names of the result files in a single directory scan
+    if not os.path.isdir(path):
+        return set()
+    with os.scandir(path) as entries:
+        return {entry.name for entry in entries}
+
+
 def is_already_computed(dataset_name, model_name, run, optim_loss):
-    return os.path.exists(result_path(args.results, dataset_name, model_name, run, optim_loss))
+    return result_name(dataset_name, model_name, run, optim_loss) in computed_results
 
 
 def save_results(dataset_name, model_name, run, optim_loss, *results):
-    rpath = result_path(args.results, dataset_name, model_name, run, optim_loss)
+    rpath = result_path(dataset_name, model_name, run, optim_loss)
     qp.util.create_parent_dir(rpath)
-    with open(rpath, 'wb') as foo:
-        pickle.dump(tuple(results), foo, pickle.HIGHEST_PROTOCOL)
+    # contiguous arrays are serialized by protocol 5 straight from their buffers, without intermediate copies
+    results = tuple(np.ascontiguousarray(r) if isinstance(r, np.ndarray) else r for r in results)
+    with open(rpath, 'wb', buffering=1 << 20) as foo:
+        pickle.dump(results, foo, protocol=5)
+
 
+# the same collection is requested once for every model and optimization loss; keep it in memory
+collections = {}
 
-def run(experiment):
-    optim_loss, dataset_name, (model_name, model, hyperparams) = experiment
+
+def fetch_collection(dataset_name):
+    if dataset_name not in collections:
+        collections[dataset_name] = qp.datasets.fetch_UCIBinaryLabelledCollection(dataset_name)
+    return collections[dataset_name]
+
+
+# n_jobs is the number of workers of the model selection
+def run(experiment, n_jobs=1):
+    optim_loss, dataset_name, (model_name, model_factory, hyperparams) = experiment
     if dataset_name in ['acute.a', 'acute.b', 'iris.1']: return
 
-    collection = qp.datasets.fetch_UCIBinaryLabelledCollection(dataset_name)
+    # the collection is only loaded if any of the runs still needs to be computed
+    missing_runs = {
+        run for run in range(5) if not is_already_computed(dataset_name, model_name, run=run, optim_loss=optim_loss)
+    }
+    if len(missing_runs) == 0:
+        print(f'results for dataset={dataset_name} model={model_name} loss={optim_loss} already computed.')
+        return
+
+    collection = fetch_collection(dataset_name)
     for run, data in enumerate(qp.data.Dataset.kFCV(collection, nfolds=5, nrepeats=1)):
-        if is_already_computed(dataset_name, model_name, run=run, optim_loss=optim_loss):
+        if run not in missing_runs:
             print(f'result for dataset={dataset_name} model={model_name} loss={optim_loss} run={run+1}/5 already computed.')
             continue
 
         print(f'running dataset={dataset_name} model={model_name} loss={optim_loss} run={run+1}/5')
         # model selection (hyperparameter optimization for a quantification-oriented loss)
         train, test = data.train_test
+        model = model_factory()
         if hyperparams is not None:
             train, val = train.split_stratified()
             model_selection = qp.model_selection.GridSearchQ(
-                deepcopy(model),
+                model,
                 param_grid=hyperparams,
                 protocol=APP(val, n_prevalences=21, repeats=25),
                 error=optim_loss,
                 refit=True,
                 timeout=60*60,
+                n_jobs=n_jobs,
                 verbose=False
             )
             model_selection.fit(*train.Xy)
@@ -139,6 +177,10 @@ def run(experiment):
             model,
             protocol=APP(test, n_prevalences=21, repeats=100)
         )
+        # single precision is more than enough for prevalence values, and halves the size of the stored results; the
+        # cast is done before reporting, so that the metrics printed coincide with those computed in show_results
+        true_prevalences = true_prevalences.astype(np.float32, copy=False)
+        estim_prevalences = estim_prevalences.astype(np.float32, copy=False)
         test_true_prevalence = test.prevalence()
 
         evaluate_experiment(true_prevalences, estim_prevalences)
@@ -172,11 +214,13 @@ if __name__ == '__main__':
                         help='path to the directory where to store the results', default='./results/uci_binary')
     parser.add_argument('--svmperfpath', metavar='SVMPERF_PATH', type=str, default='../svm_perf_quantification',
                         help='path to the directory with svmperf')
-    parser.add_argument('--checkpointdir', metavar='PATH', type=str, default='./checkpoint',
-                        help='path to the directory where to dump QuaNet checkpoints')
+    parser.add_argument('--checkpointdir', metavar='PATH', type=str, default=None,
+                        help='path to the directory where to dump QuaNet checkpoints; if not specified, '
+                             'the checkpoints are kept in memory')
     args = parser.parse_args()
 
     print(f'Result folder: {args.results}')
+    computed_results = list_results(args.results)
     np.random.seed(0)
 
     qp.environ['SVMPERF_HOME'] = args.svmperfpath
@@ -184,12 +228,18 @@ if __name__ == '__main__':
     optim_losses = ['mae']
     datasets = qp.datasets.UCI_BINARY_DATASETS
 
-    models = quantification_models()
-    qp.util.parallel(run, itertools.product(optim_losses, datasets, models), n_jobs=N_JOBS)
+    # experiments are run sequentially, and the parallelism is instead spent in the model selection, thus avoiding
+    # oversubscribing the cores
+    models = list(quantification_models())
+    for experiment in itertools.product(optim_losses, datasets, models):
+        run(experiment, n_jobs=N_JOBS)
 
-    models = quantification_cuda_models()
+    # the cache is copied into the parallel workers along with run(); do not ship the loaded collections
+    collections.clear()
+    models = list(quantification_cuda_models())
     qp.util.parallel(run, itertools.product(optim_losses, datasets, models), n_jobs=CUDA_N_JOBS)
 
-    shutil.rmtree(args.checkpointdir, ignore_errors=True)
+    if args.checkpointdir is not None:
+        shutil.rmtree(args.checkpointdir, ignore_errors=True)
 
     show_results(args.results)
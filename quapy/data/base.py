@@ -1,4 +1,5 @@
 import itertools
+import math
 from functools import cached_property
 from typing import Iterable
 
@@ -33,7 +34,6 @@ class LabelledCollection:
         else:
             self.instances = np.asarray(instances)
         self.labels = np.asarray(labels)
-        n_docs = len(self)
         if classes is None:
             self.classes_ = F.classes_from_labels(self.labels)
         else:
@@ -41,7 +41,7 @@ class LabelledCollection:
             self.classes_.sort()
             if len(set(self.labels).difference(set(classes))) > 0:
                 raise ValueError(f'labels ({set(self.labels)}) contain values not included in classes_ ({set(classes)})')
-        self.index = {class_: np.arange(n_docs)[self.labels == class_] for class_ in self.classes_}
+        self.index = {class_: np.flatnonzero(self.labels == class_) for class_ in self.classes_}
 
     @classmethod
     def load(cls, path: str, loader_func: callable, classes=None, **loader_kwargs):
@@ -132,7 +132,10 @@ class LabelledCollection:
         if len(prevs) == self.n_classes - 1:
             prevs = prevs + (1 - sum(prevs),)
         assert len(prevs) == self.n_classes, 'unexpected number of prevalences'
-        assert np.isclose(sum(prevs), 1), f'prevalences ({prevs}) wrong range (sum={sum(prevs)})'
+        # this method is invoked once per sample; checking the python scalar is much faster than using np.isclose
+        prevs_sum = sum(prevs)
+        assert math.isclose(prevs_sum, 1, rel_tol=1e-5, abs_tol=1e-8), \
+            f'prevalences ({prevs}) wrong range (sum={prevs_sum})'
 
         # Decide how many instances should be taken for each class in order to satisfy the requested prevalence
         # accurately, and the number of instances in the sample (exactly). If int(size * prevs[i]) (which is
@@ -118,18 +118,26 @@ def _prevalence_report(true_prevs, estim_prevs, error_metrics: Iterable[Union[st
     assert all(hasattr(e, '__call__') for e in error_funcs), 'invalid error functions'
     error_names = [e.__name__ for e in error_funcs]
 
-    row_entries = []
-    for true_prev, estim_prev in zip(true_prevs, estim_prevs):
-        series = {'true-prev': true_prev, 'estim-prev': estim_prev}
-        for error_name, error_metric in zip(error_names, error_funcs):
-            score = error_metric(true_prev, estim_prev)
-            series[error_name] = score
-        row_entries.append(series)
-
-    df = pd.DataFrame.from_records(row_entries)
+    true_prevs = np.asarray(true_prevs)
+    estim_prevs = np.asarray(estim_prevs)
+    report = {'true-prev': list(true_prevs), 'estim-prev': list(estim_prevs)}
+    for error_name, error_metric in zip(error_names, error_funcs):
+        report[error_name] = _sample_wise_scores(error_metric, true_prevs, estim_prevs)
+
+    df = pd.DataFrame(report)
     return df
 
 
+def _sample_wise_scores(error_metric: Callable, true_prevs: np.ndarray, estim_prevs: np.ndarray):
+    # the error functions in qp.error operate along the last axis, and so all samples can be scored in one call;
+    # averaged errors (e.g., 'mae') computed on one sample amount to their sample-wise counterparts (e.g., 'ae')
+    if error_metric in qp.error.QUANTIFICATION_ERROR:
+        error_metric = qp.error.from_name(error_metric.__name__[1:])
+    if error_metric in qp.error.QUANTIFICATION_ERROR_SINGLE:
+        return error_metric(true_prevs, estim_prevs)
+    return [error_metric(true_prev, estim_prev) for true_prev, estim_prev in zip(true_prevs, estim_prevs)]
+
+
 def evaluate(
         model: BaseQuantifier,
         protocol: AbstractProtocol,
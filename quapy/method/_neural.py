@@ -1,4 +1,5 @@
 import os
+from copy import deepcopy
 from pathlib import Path
 import random
 
@@ -6,6 +7,7 @@ import torch
 from torch.nn import MSELoss
 from torch.nn.functional import relu
 
+import quapy.functional as F
 from quapy.protocol import UPP
 from quapy.method.aggregative import *
 from quapy.util import EarlyStop
@@ -59,7 +61,8 @@ class QuaNetTrainer(BaseQuantifier):
     :param qdrop_p: float, dropout probability
     :param patience: integer, number of epochs showing no improvement in the validation set before stopping the
         training phase (early stopping)
-    :param checkpointdir: string, a path where to store models' checkpoints
+    :param checkpointdir: string, a path where to store models' checkpoints; set to None for keeping the best
+        parameters in memory instead of dumping them to disk
     :param checkpointname: string (optional), the name of the model's checkpoint
     :param device: string, indicate "cpu" or "cuda"
     """
@@ -109,7 +112,7 @@ class QuaNetTrainer(BaseQuantifier):
             random_code = '-'.join(str(local_random.randint(0, 1000000)) for _ in range(5))
             checkpointname = 'QuaNet-'+random_code
         self.checkpointdir = checkpointdir
-        self.checkpoint = os.path.join(checkpointdir, checkpointname)
+        self.checkpoint = None if checkpointdir is None else os.path.join(checkpointdir, checkpointname)
         self.device = torch.device(device)
 
         self.__check_params_colision(self.quanet_params, self.classifier.get_params())
@@ -127,7 +130,8 @@ class QuaNetTrainer(BaseQuantifier):
         """
         data = LabelledCollection(X, y)
         self._classes_ = data.classes_
-        os.makedirs(self.checkpointdir, exist_ok=True)
+        if self.checkpointdir is not None:
+            os.makedirs(self.checkpointdir, exist_ok=True)
 
         if self.fit_classifier:
             classifier_data, unused_data = data.split_stratified(0.4)
@@ -178,23 +182,43 @@ class QuaNetTrainer(BaseQuantifier):
         self.optim = torch.optim.Adam(self.quanet.parameters(), lr=self.lr)
         early_stop = EarlyStop(self.patience, lower_is_better=True)
 
-        checkpoint = self.checkpoint
+        # the embeddings and posteriors are moved to the device once for the whole training, and the samples are then
+        # gathered in the device, instead of transferring every sample from host to device
+        to_device = lambda x: torch.as_tensor(x, dtype=torch.float, device=self.device)
+        train_device_data = (to_device(train_data_embed.instances), to_device(train_posteriors))
+        valid_device_data = (to_device(valid_data_embed.instances), to_device(valid_posteriors))
 
         for epoch_i in range(1, self.n_epochs):
-            self._epoch(train_data_embed, train_posteriors, self.tr_iter, epoch_i, early_stop, train=True)
-            self._epoch(valid_data_embed, valid_posteriors, self.va_iter, epoch_i, early_stop, train=False)
+            self._epoch(train_data_embed, train_posteriors, train_device_data, self.tr_iter, epoch_i, early_stop, train=True)
+            self._epoch(valid_data_embed, valid_posteriors, valid_device_data, self.va_iter, epoch_i, early_stop, train=False)
 
             early_stop(self.status['va-loss'], epoch_i)
             if early_stop.IMPROVED:
-                torch.save(self.quanet.state_dict(), checkpoint)
+                self._save_checkpoint()
             elif early_stop.STOP:
-                print(f'training ended by patience exhausted; loading best model parameters in {checkpoint} '
+                where = 'memory' if self.checkpoint is None else self.checkpoint
+                print(f'training ended by patience exhausted; loading best model parameters in {where} '
                       f'for epoch {early_stop.best_epoch}')
-                self.quanet.load_state_dict(torch.load(checkpoint))
+                self._load_checkpoint()
                 break
 
+        # the in-memory copy of the best parameters is only needed during training
+        self._best_state = None
         return self
 
+    def _save_checkpoint(self):
+        if self.checkpoint is None:
+            self._best_state = deepcopy(self.quanet.state_dict())
+        else:
+            torch.save(self.quanet.state_dict(), self.checkpoint)
+
+    def _load_checkpoint(self):
+        if self.checkpoint is None:
+            self.quanet.load_state_dict(self._best_state)
+            self._best_state = None
+        else:
+            self.quanet.load_state_dict(torch.load(self.checkpoint))
+
     def _get_aggregative_estims(self, posteriors):
         label_predictions = np.argmax(posteriors, axis=-1)
         prevs_estim = []
@@ -218,7 +242,7 @@ class QuaNetTrainer(BaseQuantifier):
             prevalence = prevalence.numpy().flatten()
         return prevalence
 
-    def _epoch(self, data: LabelledCollection, posteriors, iterations, epoch, early_stop, train):
+    def _epoch(self, data: LabelledCollection, posteriors, device_data, iterations, epoch, early_stop, train):
         mse_loss = MSELoss()
 
         self.quanet.train(mode=train)
@@ -230,22 +254,26 @@ class QuaNetTrainer(BaseQuantifier):
             repeats=iterations,
             random_state=None if train else 0  # different samples during train, same samples during validation
         )
+        device_embeddings, device_posteriors = device_data
         pbar = tqdm(sampler.samples_parameters(), total=sampler.total())
         for it, index in enumerate(pbar):
-            sample_data = data.sampling_from_index(index)
             sample_posteriors = posteriors[index]
             quant_estims = self._get_aggregative_estims(sample_posteriors)
-            ptrue = torch.as_tensor([sample_data.prevalence()], dtype=torch.float, device=self.device)
+            sample_prev = F.prevalence_from_labels(data.labels[index], data.classes_)
+            ptrue = torch.as_tensor([sample_prev], dtype=torch.float, device=self.device)
+            device_index = torch.as_tensor(index, device=self.device)
+            sample_embeddings = device_embeddings[device_index]
+            sample_device_posteriors = device_posteriors[device_index]
             if train:
                 self.optim.zero_grad()
-                phat = self.quanet.forward(sample_data.instances, sample_posteriors, quant_estims)
+                phat = self.quanet.forward(sample_embeddings, sample_device_posteriors, quant_estims)
                 loss = mse_loss(phat, ptrue)
                 mae = mae_loss(phat, ptrue)
                 loss.backward()
                 self.optim.step()
             else:
                 with torch.no_grad():
-                    phat = self.quanet.forward(sample_data.instances, sample_posteriors, quant_estims)
+                    phat = self.quanet.forward(sample_embeddings, sample_device_posteriors, quant_estims)
                     loss = mse_loss(phat, ptrue)
                     mae = mae_loss(phat, ptrue)
 
@@ -296,14 +324,18 @@ class QuaNetTrainer(BaseQuantifier):
         """
         Removes the checkpoint
         """
-        os.remove(self.checkpoint)
+        if self.checkpoint is None:
+            self._best_state = None
+        else:
+            os.remove(self.checkpoint)
 
     def clean_checkpoint_dir(self):
         """
         Removes anything contained in the checkpoint directory
         """
-        import shutil
-        shutil.rmtree(self.checkpointdir, ignore_errors=True)
+        if self.checkpointdir is not None:
+            import shutil
+            shutil.rmtree(self.checkpointdir, ignore_errors=True)
 
     @property
     def classes_(self):
@@ -378,10 +410,10 @@ class QuaNetModule(torch.nn.Module):
 
     def _init_hidden(self):
         directions = 2 if self.bidirectional else 1
-        var_hidden = torch.zeros(self.nlayers * directions, 1, self.hidden_size)
-        var_cell = torch.zeros(self.nlayers * directions, 1, self.hidden_size)
-        if next(self.lstm.parameters()).is_cuda:
-            var_hidden, var_cell = var_hidden.cuda(), var_cell.cuda()
+        # the states are allocated directly in the device of the LSTM, avoiding one host-to-device copy per forward pass
+        device = next(self.lstm.parameters()).device
+        var_hidden = torch.zeros(self.nlayers * directions, 1, self.hidden_size, device=device)
+        var_cell = torch.zeros(self.nlayers * directions, 1, self.hidden_size, device=device)
         return var_hidden, var_cell
 
     def forward(self, doc_embeddings, doc_posteriors, statistics):
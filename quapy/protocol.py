@@ -1,4 +1,4 @@
-from copy import deepcopy
+from copy import copy
 from typing import Iterable
 
 import quapy as qp
@@ -206,7 +206,9 @@ class OnLabelledCollectionProtocol:
             self.data.instances = pre_classifications
             return self
         else:
-            new = deepcopy(self)
+            # the original instances are about to be replaced, so there is no need to (deep) copy them
+            new = copy(self)
+            new.data = copy(self.data)
             return new.on_preclassified_instances(pre_classifications, in_place=True)
 
     @classmethod
@@ -84,6 +84,24 @@ class EvalTestCase(unittest.TestCase):
 
             self.assertEqual(scores.mean(), score)
 
+    def test_report_scores(self):
+        """
+        Checks the sample-wise scores in the evaluation report coincide with those computed sample by sample
+        """
+
+        qp.environ['SAMPLE_SIZE'] = 100
+
+        true_prevs = qp.functional.uniform_simplex_sampling(n_classes=3, size=50)
+        estim_prevs = qp.functional.uniform_simplex_sampling(n_classes=3, size=50)
+
+        error_metrics = ['mae', 'mrae', 'ae', 'nkld', qp.error.md]
+        report = qp.evaluation._prevalence_report(true_prevs, estim_prevs, error_metrics=error_metrics)
+        for error_metric in error_metrics:
+            if isinstance(error_metric, str):
+                error_metric = qp.error.from_name(error_metric)
+            expected = [error_metric(true_prev, estim_prev) for true_prev, estim_prev in zip(true_prevs, estim_prevs)]
+            self.assertTrue(np.allclose(report[error_metric.__name__].values, expected))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -112,6 +112,54 @@ class TestMethods(unittest.TestCase):
         estim_prevalences = model.predict(dataset.test.instances)
         self.assertTrue(check_prevalence_vector(estim_prevalences))
 
+    def test_quanet_checkpoint_in_memory(self):
+        try:
+            import quapy.classification.neural
+        except ModuleNotFoundError:
+            print('the torch package is not installed; skipping unit test for QuaNet')
+            return
+
+        import os
+        import io
+        import tempfile
+        import contextlib
+        import numpy as np
+        import torch
+        from quapy.classification.methods import LowRankLogisticRegression
+        from quapy.method.meta import QuaNet
+
+        qp.environ['SAMPLE_SIZE'] = 50
+
+        # synthetic data, so that the test does not need to download any dataset
+        rng = np.random.RandomState(0)
+        X = rng.rand(800, 20)
+        y = (X[:, 0] + 0.3 * rng.rand(800) > 0.6).astype(int)
+
+        def fit_predict(checkpointdir):
+            np.random.seed(0)
+            torch.manual_seed(0)
+            model = QuaNet(LowRankLogisticRegression(n_components=5), device='cpu', n_epochs=30,
+                           tr_iter_per_poch=20, va_iter_per_poch=10, patience=1, checkpointdir=checkpointdir)
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                model.fit(X, y)
+            # small patience guarantees the best parameters are restored from the checkpoint
+            self.assertIn('patience exhausted', stdout.getvalue())
+            return model, model.predict(X[:100])
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ondisk_dir = os.path.join(tmpdir, 'checkpoint')
+            _, ondisk_prevalences = fit_predict(ondisk_dir)
+            self.assertTrue(os.path.isdir(ondisk_dir))
+
+            model, inmemory_prevalences = fit_predict(None)
+            self.assertIsNone(model.checkpoint)
+            self.assertIsNone(model._best_state)
+            self.assertEqual(os.listdir(tmpdir), ['checkpoint'])
+
+        self.assertTrue(check_prevalence_vector(inmemory_prevalences))
+        self.assertTrue(np.allclose(ondisk_prevalences, inmemory_prevalences))
+
     def test_composable(self):
         if check_compatible_qunfold_version():
             for dataset in TestMethods.datasets:
@@ -165,6 +165,21 @@ class TestProtocols(unittest.TestCase):
 
         self.assertNotEqual(samples1, samples2)
 
+    def test_on_preclassified_instances(self):
+        data = mock_labelled_collection()
+        p = APP(data, sample_size=5, n_prevalences=11, random_state=42)
+        pre_classified = np.arange(len(data))
+        p_pre = p.on_preclassified_instances(pre_classified)
+
+        # the original protocol is not modified
+        self.assertIs(p.get_labelled_collection(), data)
+        self.assertEqual(data.instances[0], '0-0')
+
+        # the samples of the new protocol are drawn from the pre-classified instances with the same indexes
+        for (instances, prev), (pre_instances, pre_prev) in zip(p(), p_pre()):
+            self.assertTrue(all(data.instances[pre_instances] == instances))
+            self.assertTrue(np.allclose(prev, pre_prev))
+
     def test_no_seed_init(self):
         class NoSeedInit(AbstractStochasticSeededProtocol):
             def __init__(self):